@@ -8,6 +8,7 @@ to analyze potential bias in AI-powered information retrieval systems.
 
 import json
 import os
+from itertools import islice
 from typing import Dict, List
 
 from rag_bias_analysis import (
@@ -35,8 +36,7 @@ def run_demo_analysis(api_key: str = None, num_samples: int = 20):
     analyzer = RAGBiasAnalyzer(SYSTEM_PROMPT)
 
     # Generate test cases
-    all_test_cases = analyzer.run_full_analysis()
-    test_cases = all_test_cases[:num_samples]  # Limit for demo
+    test_cases = list(islice(analyzer.run_full_analysis(), num_samples))  # Limit for demo
 
     print(f"📊 Generated {len(test_cases)} test cases")
     print(f"👥 Testing {len(TEST_PROFILES)} user profiles")
@@ -3,21 +3,119 @@ Bias analysis and visualization tools.
 """
 
 import ast
+import json
 import os
-from typing import Any, Dict
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import cached_property
+from typing import Any, Callable, Dict, Union, cast
 
+import numpy as np
 import pandas as pd
 from scipy import stats
 
 # Optional visualization imports
 try:
-    import matplotlib.pyplot as plt
     import seaborn as sns
+    from matplotlib.figure import Figure
 
     VISUALIZATION_AVAILABLE = True
 except ImportError:
     VISUALIZATION_AVAILABLE = False
 
+# Profile fields copied into their own columns, with defaults for missing values
+PROFILE_FIELDS = {
+    "name": "",
+    "title": "",
+    "department": "Unknown",
+    "location": "",
+    "pronouns": "",
+    "years_at_company": 0,
+}
+
+# Title keywords per seniority level, checked in order
+SENIORITY_KEYWORDS = {
+    "junior": ["junior", "intern", "entry"],
+    "mid": ["mid", "intermediate"],
+    "senior": ["senior", "lead", "principal", "staff"],
+    "manager": ["manager", "director", "vp", "head"],
+}
+
+# One precompiled whole-word pattern per level, e.g. r"\b(junior|intern|entry)\b"
+_SENIORITY_PATTERNS = {
+    level: re.compile(r"\b(?:" + "|".join(map(re.escape, keywords)) + r")\b", re.IGNORECASE)
+    for level, keywords in SENIORITY_KEYWORDS.items()
+}
+
+# Location substrings per cultural group, checked in order
+CULTURAL_GROUPS = {
+    "Western": ["New York, USA", "London", "Dublin", "Tel Aviv"],
+    "Asian": ["Seoul", "Mumbai, India", "Singapore"],
+    "African": ["Lagos, Nigeria"],
+    "Eastern European": ["Moscow, Russia"],
+    "Middle Eastern": ["Dubai"],
+    "Latin American": ["Mexico City"]
+}
+
+# Name substrings per perceived ethnicity, checked in order
+ETHNICITY_NAME_PATTERNS = {
+    "Arabic/Middle Eastern": ["Mohammed"],
+    "Nigerian/African": ["Oluwaseun"],
+    "Indian/South Asian": ["Priya"],
+    "Anglo/Western": ["John", "Michael", "Sarah", "Jennifer", "David", "Rachel", "Emma", "Alex"],
+    "Russian/Eastern European": ["Anastasia"],
+    "East Asian": ["Alex Kim"],  # Kim is Korean
+    "Latino": ["Carlos"]
+}
+
+# Broader geographic region per city, used by the cultural bias heatmap
+REGION_BY_CITY = {
+    'Tel Aviv': 'Middle East', 'Dubai': 'Middle East',
+    'London': 'Europe', 'Paris': 'Europe', 'Dublin': 'Europe', 'Barcelona': 'Europe', 'Moscow': 'Europe',
+    'New York': 'North America', 'Mexico City': 'North America',
+    'Singapore': 'Asia', 'Seoul': 'Asia', 'Mumbai': 'Asia',
+    'Lagos': 'Africa',
+    'Remote': 'Remote'
+}
+
+
+def _perceived_ethnicity(name: str) -> str:
+    """Return the first ETHNICITY_NAME_PATTERNS group whose name patterns occur in the name."""
+    for ethnicity, names in ETHNICITY_NAME_PATTERNS.items():
+        if any(pattern in name for pattern in names):
+            return ethnicity
+    return "Other"
+
+
+def _render_plot_in_worker(df: pd.DataFrame, method_name: str, output_dir: str) -> None:
+    """
+    Render a single plot inside a worker process.
+
+    The DataFrame arrives already prepared, so the analyzer is rebuilt without
+    re-running _prepare_data before calling the requested `_create_*` method.
+    """
+    analyzer = BiasAnalyzer.__new__(BiasAnalyzer)
+    analyzer.df = df
+    getattr(analyzer, method_name)(output_dir)
+
+
+def _to_json_dict(data: Union[pd.DataFrame, pd.Series]) -> Dict[str, Any]:
+    """
+    Convert aggregation results to JSON-ready primitives.
+
+    Goes through pandas' C JSON writer instead of `to_dict()`, which boxes
+    every cell into a Python object. Keeps the `to_dict()` layout
+    ({column: {index: value}} for frames, {index: value} for series), with
+    NaN as None. Two differences from `to_dict()`:
+    - Keys are strings, so a MultiIndex key becomes "('a', 'b')" rather
+      than the tuple ('a', 'b').
+    - Floats are rounded to 15 significant digits (0.1 + 0.2 comes back
+      as 0.3), which is fine for reported statistics but not bit-exact.
+    """
+    orient = "columns" if isinstance(data, pd.DataFrame) else "index"
+    return cast(Dict[str, Any], json.loads(data.to_json(orient=orient, double_precision=15)))
+
 
 class BiasAnalyzer:
     """Analyze bias patterns in test results."""
@@ -32,45 +130,64 @@ class BiasAnalyzer:
         if 'profile' in self.df.columns and isinstance(self.df['profile'].iloc[0], str):
             self.df['profile'] = self.df['profile'].apply(lambda x: ast.literal_eval(x) if isinstance(x, str) else x)
 
+        # Explode profile dicts into plain columns once
+        self._extract_profile_columns()
+
         # Flatten nested bias indicators
         self._flatten_bias_indicators()
 
         # Add derived columns for visualization
         self._add_derived_columns()
 
+    def _extract_profile_columns(self) -> None:
+        """
+        Copy profile fields into dedicated DataFrame columns.
+
+        Profiles are stored as one dict per row; the analyses below filter and
+        group on individual fields, so converting them to columns once lets
+        pandas work on whole columns instead of calling a lambda per row.
+        """
+        if 'profile' not in self.df.columns:
+            return
+
+        profiles = [p if isinstance(p, dict) else {} for p in self.df['profile']]
+        profile_table = pd.DataFrame(profiles, index=self.df.index).reindex(columns=list(PROFILE_FIELDS))
+
+        for field, default in PROFILE_FIELDS.items():
+            self.df[field] = profile_table[field].fillna(default).astype(type(default))
+
+        # City without country suffix, e.g. "Lagos, Nigeria" -> "Lagos"
+        self.df['city'] = self.df['location'].str.split(',', n=1).str[0]
+
     def _add_derived_columns(self):
         """Add derived columns needed for visualization."""
+        if 'pronouns' not in self.df.columns:
+            return
+
         # Infer gender from pronouns
-        def infer_gender(profile):
-            if isinstance(profile, dict):
-                pronouns = profile.get('pronouns', '').lower()
-                if 'she/her' in pronouns:
-                    return 'female'
-                elif 'he/him' in pronouns:
-                    return 'male'
-                elif 'they/them' in pronouns:
-                    return 'non-binary'
-            return 'unknown'
-
-        self.df['inferred_gender'] = self.df['profile'].apply(infer_gender)
+        pronouns = self.df['pronouns'].str.lower()
+        self.df['inferred_gender'] = np.select(
+            [
+                pronouns.str.contains('she/her', regex=False),
+                pronouns.str.contains('he/him', regex=False),
+                pronouns.str.contains('they/them', regex=False),
+            ],
+            ['female', 'male', 'non-binary'],
+            default='unknown',
+        )
 
         # Infer seniority level from title
-        def infer_seniority(profile):
-            if isinstance(profile, dict):
-                title = profile.get('title', '').lower()
-                if 'intern' in title:
-                    return 'intern'
-                elif 'junior' in title:
-                    return 'junior'
-                elif 'senior' in title or 'manager' in title:
-                    return 'senior'
-                elif 'vp' in title or 'director' in title:
-                    return 'manager'
-                else:
-                    return 'mid'
-            return 'unknown'
-
-        self.df['seniority_level'] = self.df['profile'].apply(infer_seniority)
+        title = self.df['title'].str.lower()
+        self.df['seniority_level'] = np.select(
+            [
+                title.str.contains('intern', regex=False),
+                title.str.contains('junior', regex=False),
+                title.str.contains('senior', regex=False) | title.str.contains('manager', regex=False),
+                title.str.contains('vp', regex=False) | title.str.contains('director', regex=False),
+            ],
+            ['intern', 'junior', 'senior', 'manager'],
+            default='mid',
+        )
 
     def _flatten_bias_indicators(self):
         """
@@ -91,20 +208,58 @@ class BiasAnalyzer:
         ]
 
         for bias_type in bias_types:
-            if bias_type in self.df.columns:
-                for idx, row in self.df.iterrows():
-                    indicators = row.get(bias_type, {})
-                    if isinstance(indicators, dict):
-                        for key, value in indicators.items():
-                            column_name = f"{bias_type}_{key}"
-                            if column_name not in self.df.columns:
-                                self.df[column_name] = 0  # Initialize column
-                            self.df.at[idx, column_name] = value
+            if bias_type not in self.df.columns:
+                continue
+
+            indicator_dicts = [d if isinstance(d, dict) else {} for d in self.df[bias_type].values]
+
+            # First pass: collect every indicator key (in first-seen order)
+            key_index: Dict[str, int] = {}
+            for indicators in indicator_dicts:
+                for key in indicators:
+                    key_index.setdefault(key, len(key_index))
+            if not key_index:
+                continue
+
+            # Second pass: fill a preallocated array, then assign all columns at once
+            values = np.zeros((len(indicator_dicts), len(key_index)), dtype=np.float64)
+            for row_idx, indicators in enumerate(indicator_dicts):
+                for key, value in indicators.items():
+                    values[row_idx, key_index[key]] = value
+
+            column_names = [f"{bias_type}_{key}" for key in key_index]
+            self.df[column_names] = values
+
+    @cached_property
+    def _binary_inferred_gender(self) -> np.ndarray:
+        """
+        Female/male/unknown gender from exact pronouns, as used by the gender analysis.
 
-    def analyze_by_dimension(self, dimension: str) -> Dict[str, Any]:
-        """Analyze bias patterns by specific dimension."""
+        Computed on first use, when it also replaces the inferred_gender column
+        so later intersectional analysis groups on the same labels.
+        """
+        # Extract gender from profiles (simplified - you'd want more sophisticated detection)
+        pronouns = self.df["pronouns"].to_numpy()
+        inferred_gender = np.select([pronouns == "she/her", pronouns == "he/him"], ["female", "male"], default="unknown")
+        self.df["inferred_gender"] = inferred_gender
+        return inferred_gender
 
-        analyses = {
+    @cached_property
+    def _perceived_ethnicity_labels(self) -> pd.Series:
+        """
+        Perceived ethnicity per row, categorized once per distinct name.
+
+        Computed on first use, when it also adds the perceived_ethnicity column.
+        """
+        # Categorize names by perceived ethnicity
+        names = self.df["name"]
+        perceived_ethnicity = names.map({name: _perceived_ethnicity(name) for name in names.unique()})
+        self.df["perceived_ethnicity"] = perceived_ethnicity
+        return perceived_ethnicity
+
+    def _dimension_analyses(self) -> Dict[str, Callable[[], Dict[str, Any]]]:
+        """Map each dimension name to its analysis, intersectional last."""
+        return {
             "gender": self._analyze_gender_bias,
             "seniority": self._analyze_seniority_bias,
             "department": self._analyze_department_bias,
@@ -114,7 +269,22 @@ class BiasAnalyzer:
             "intersectional": self._analyze_intersectional_bias,
         }
 
-        return analyses.get(dimension, lambda: {})()
+    def analyze_by_dimension(self, dimension: str) -> Dict[str, Any]:
+        """Analyze bias patterns by specific dimension."""
+        return self._dimension_analyses().get(dimension, lambda: {})()
+
+    def analyze_all(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Run every bias dimension analysis in a single call.
+
+        The analyses run in dependency order, so the intersectional analysis
+        reuses the gender, seniority, cultural and ethnicity columns derived
+        by the earlier ones instead of the caller having to prime them.
+
+        Returns:
+            Dictionary mapping dimension name to its analysis results
+        """
+        return {dimension: analysis() for dimension, analysis in self._dimension_analyses().items()}
 
     def _analyze_gender_bias(self) -> Dict[str, Any]:
         """
@@ -125,22 +295,12 @@ class BiasAnalyzer:
           while males are more likely to be described as leaders"
         - Tests for leadership vs communal language patterns
         """
-        # Extract gender from profiles (simplified - you'd want more sophisticated detection)
-        self.df["inferred_gender"] = self.df["profile"].apply(
-            lambda p: (
-                "female"
-                if p.get("pronouns", "") == "she/her"
-                else "male"
-                if p.get("pronouns", "") == "he/him"
-                else "unknown"
-            )
-        )
+        inferred_gender = self._binary_inferred_gender
 
         # Compare same role, different gender (Sarah vs Michael Chen - from docs)
-        same_role_comparison = self.df[
-            (self.df["profile"].apply(lambda x: x["title"]) == "Senior Software Engineer")
-            & (self.df["inferred_gender"] != "unknown")
-        ]
+        # Single boolean mask built from plain NumPy arrays
+        same_role_mask = (self.df["title"].to_numpy() == "Senior Software Engineer") & (inferred_gender != "unknown")
+        same_role_comparison = self.df[same_role_mask]
 
         if len(same_role_comparison) > 0:
             # Build aggregation dict dynamically based on available columns
@@ -156,18 +316,26 @@ class BiasAnalyzer:
             if "communal_language_count" in same_role_comparison.columns:
                 agg_dict["communal_language_count"] = ["mean", "std"]
 
-            gender_stats = same_role_comparison.groupby("inferred_gender").agg(agg_dict)
+            # One groupby serves both the aggregation and the t-test samples
+            gender_groups = same_role_comparison.groupby("inferred_gender", sort=False)
+            gender_stats = gender_groups.agg(agg_dict)
 
             # Flatten MultiIndex columns for JSON serialization
             gender_stats.columns = ["_".join(col).strip() for col in gender_stats.columns]
-            gender_dict = gender_stats.to_dict()
+            gender_dict = _to_json_dict(gender_stats)
 
             # Statistical significance test
-            male_data = same_role_comparison[same_role_comparison["inferred_gender"] == "male"]
-            female_data = same_role_comparison[same_role_comparison["inferred_gender"] == "female"]
-
-            if len(male_data) > 0 and len(female_data) > 0:
-                t_stat, p_value = stats.ttest_ind(male_data["response_length"], female_data["response_length"])
+            # Reuse the aggregated means/stds instead of rescanning the samples
+            if {"male", "female"} <= gender_groups.groups.keys():
+                group_sizes = gender_groups.size()
+                t_stat, p_value = stats.ttest_ind_from_stats(
+                    gender_stats.at["male", "response_length_mean"],
+                    gender_stats.at["male", "response_length_std"],
+                    group_sizes["male"],
+                    gender_stats.at["female", "response_length_mean"],
+                    gender_stats.at["female", "response_length_std"],
+                    group_sizes["female"],
+                )
 
                 return {
                     "statistics": gender_dict,
@@ -186,27 +354,13 @@ class BiasAnalyzer:
 
         Tests Jennifer progression: Smith (Junior) → Williams (Manager) → Anderson (VP)
         """
-        # Extract seniority levels
-        seniority_keywords = {
-            "junior": ["junior", "intern", "entry"],
-            "mid": ["mid", "intermediate"],
-            "senior": ["senior", "lead", "principal", "staff"],
-            "manager": ["manager", "director", "vp", "head"],
-        }
-
-        def get_seniority(title):
-            title_lower = title.lower()
-            for level, keywords in seniority_keywords.items():
-                if any(keyword in title_lower for keyword in keywords):
-                    return level
-            return "unknown"
-
-        self.df["seniority_level"] = self.df["profile"].apply(lambda x: get_seniority(x["title"]))
+        # Extract seniority levels (first matching level wins, as in SENIORITY_KEYWORDS order)
+        titles = self.df["title"]
+        conditions = [titles.str.contains(pattern) for pattern in _SENIORITY_PATTERNS.values()]
+        self.df["seniority_level"] = np.select(conditions, list(_SENIORITY_PATTERNS), default="unknown")
 
         # Focus on Jennifer progression (from docs/rag-test-profiles.md)
-        jennifer_progression = self.df[
-            self.df["profile"].apply(lambda x: "Jennifer" in x.get("name", ""))
-        ]
+        jennifer_progression = self.df[self.df["name"].str.contains("Jennifer", regex=False)]
 
         # Build aggregation dict based on available columns
         agg_dict = {
@@ -220,27 +374,28 @@ class BiasAnalyzer:
         if "beginner_accommodations" in self.df.columns:
             agg_dict["beginner_accommodations"] = "mean"
         if "assumed_expertise" in self.df.columns:
-            agg_dict["assumed_expertise"] = lambda x: x.value_counts().to_dict() if len(x) > 0 else {}
+            # Drop zero counts, which a categorical column reports for unobserved labels
+            agg_dict["assumed_expertise"] = lambda x: x.value_counts()[lambda c: c > 0].to_dict() if len(x) > 0 else {}
 
         # Aggregate by seniority
         seniority_stats = self.df.groupby("seniority_level").agg(agg_dict)
 
         result = {
-            "seniority_analysis": seniority_stats.to_dict(),
+            "seniority_analysis": _to_json_dict(seniority_stats),
             "research_alignment": "Testing if junior roles receive more detailed explanations per docs/rag-bias-research.md"
         }
 
         if len(jennifer_progression) > 0:
             result["jennifer_progression_analysis"] = {
                 "profiles_tested": ["Jennifer Smith (Junior)", "Jennifer Williams (Manager)", "Jennifer Anderson (VP)"],
-                "progression_stats": jennifer_progression.groupby("seniority_level")["response_length"].mean().to_dict()
+                "progression_stats": _to_json_dict(jennifer_progression.groupby("seniority_level")["response_length"].mean())
             }
 
         return result
 
     def _analyze_department_bias(self) -> Dict[str, Any]:
         """Analyze department-based response differences."""
-        dept_stats = self.df.groupby(self.df["profile"].apply(lambda x: x["department"])).agg(
+        dept_stats = self.df.groupby("department").agg(
             {"response_length": ["mean", "std"], "technical_depth": "mean", "formality_level": "mean"}
         )
 
@@ -250,7 +405,7 @@ class BiasAnalyzer:
                 "_".join(str(col)).strip() if isinstance(col, tuple) else str(col) for col in dept_stats.columns
             ]
 
-        return {"department_analysis": dept_stats.to_dict()}
+        return {"department_analysis": _to_json_dict(dept_stats)}
 
     def _analyze_cultural_bias(self) -> Dict[str, Any]:
         """
@@ -264,29 +419,16 @@ class BiasAnalyzer:
         Tests profiles: Oluwaseun (Nigeria), Priya (India), John (USA), Anastasia (Russia)
         """
         # Extract location/cultural context from profiles
-        cultural_groups = {
-            "Western": ["New York, USA", "London", "Dublin", "Tel Aviv"],
-            "Asian": ["Seoul", "Mumbai, India", "Singapore"],
-            "African": ["Lagos, Nigeria"],
-            "Eastern European": ["Moscow, Russia"],
-            "Middle Eastern": ["Dubai"],
-            "Latin American": ["Mexico City"]
-        }
-
         def get_cultural_group(location):
-            for group, locations in cultural_groups.items():
+            for group, locations in CULTURAL_GROUPS.items():
                 if any(loc in location for loc in locations):
                     return group
             return "Other"
 
-        self.df["cultural_group"] = self.df["profile"].apply(
-            lambda x: get_cultural_group(x.get("location", ""))
-        )
+        self.df["cultural_group"] = self.df["location"].map(get_cultural_group)
 
         # Focus on Data Scientists from different cultures (from docs/rag-test-profiles.md)
-        cultural_comparison = self.df[
-            self.df["profile"].apply(lambda x: x.get("title", "") == "Data Scientist")
-        ]
+        cultural_comparison = self.df[self.df["title"] == "Data Scientist"]
 
         if len(cultural_comparison) > 0:
             # Build aggregation dict based on available columns
@@ -308,7 +450,7 @@ class BiasAnalyzer:
                 cultural_stats.columns = ["_".join(str(col)).strip() for col in cultural_stats.columns]
 
             return {
-                "cultural_statistics": cultural_stats.to_dict(),
+                "cultural_statistics": _to_json_dict(cultural_stats),
                 "research_alignment": "Testing individualism vs collectivism per docs/rag-bias-research.md",
                 "test_profiles": ["Oluwaseun Adeyemi (Nigeria)", "Priya Sharma (India)", "John Miller (USA)", "Anastasia Volkov (Russia)"]
             }
@@ -326,33 +468,12 @@ class BiasAnalyzer:
         Tests name-based assumptions: Mohammed (Arabic), Oluwaseun (Nigerian),
         Priya (Indian), John (Anglo), Anastasia (Russian)
         """
-        # Categorize names by perceived ethnicity
-        ethnicity_patterns = {
-            "Arabic/Middle Eastern": ["Mohammed"],
-            "Nigerian/African": ["Oluwaseun"],
-            "Indian/South Asian": ["Priya"],
-            "Anglo/Western": ["John", "Michael", "Sarah", "Jennifer", "David", "Rachel", "Emma", "Alex"],
-            "Russian/Eastern European": ["Anastasia"],
-            "East Asian": ["Alex Kim"],  # Kim is Korean
-            "Latino": ["Carlos"]
-        }
-
-        def get_perceived_ethnicity(name):
-            for ethnicity, names in ethnicity_patterns.items():
-                if any(pattern in name for pattern in names):
-                    return ethnicity
-            return "Other"
-
-        self.df["perceived_ethnicity"] = self.df["profile"].apply(
-            lambda x: get_perceived_ethnicity(x.get("name", ""))
-        )
+        self._perceived_ethnicity_labels  # Adds the perceived_ethnicity column on first use
 
         # Focus on same roles with different ethnic names
         same_role_comparisons = {}
         for role in ["Data Scientist", "Senior Manager", "Intern"]:
-            role_data = self.df[
-                self.df["profile"].apply(lambda x: x.get("title", "") == role)
-            ]
+            role_data = self.df[self.df["title"] == role]
             if len(role_data) > 1:
                 same_role_comparisons[role] = role_data
 
@@ -378,7 +499,7 @@ class BiasAnalyzer:
                     ethnicity_stats.columns = ["_".join(col).strip() for col in ethnicity_stats.columns]
 
                     results["ethnicity_analysis_by_role"][role] = {
-                        "statistics": ethnicity_stats.to_dict(),
+                        "statistics": _to_json_dict(ethnicity_stats),
                         "sample_size": len(data),
                         "ethnicities_tested": data["perceived_ethnicity"].unique().tolist()
                     }
@@ -412,9 +533,7 @@ class BiasAnalyzer:
             else:
                 return "Veteran"
 
-        self.df["career_stage"] = self.df["profile"].apply(
-            lambda x: get_age_group(x.get("years_at_company", 0))
-        )
+        self.df["career_stage"] = self.df["years_at_company"].map(get_age_group)
 
         # Build aggregation dict based on available columns
         agg_dict = {
@@ -433,7 +552,7 @@ class BiasAnalyzer:
         age_stats.columns = ["_".join(col).strip() for col in age_stats.columns]
 
         return {
-            "age_statistics": age_stats.to_dict(),
+            "age_statistics": _to_json_dict(age_stats),
             "research_alignment": "Testing age-related assumptions per docs/rag-bias-research.md",
             "career_stages_tested": self.df["career_stage"].unique().tolist(),
             "age_bias_patterns": [
@@ -452,7 +571,7 @@ class BiasAnalyzer:
         - Ethnicity + Department: Technical responses to engineers with different names
         - Culture + Gender: Leadership advice across cultural and gender lines
         """
-        results = {}
+        results: Dict[str, Any] = {}
 
         # Gender + Seniority intersection
         if "inferred_gender" in self.df.columns and "seniority_level" in self.df.columns:
@@ -462,19 +581,16 @@ class BiasAnalyzer:
                 "formality_level": "mean"
             })
 
-            results["gender_seniority_intersection"] = gender_seniority.to_dict()
+            results["gender_seniority_intersection"] = _to_json_dict(gender_seniority)
 
         # Ethnicity + Department intersection
         if "perceived_ethnicity" in self.df.columns:
-            dept_ethnicity = self.df.groupby([
-                self.df["profile"].apply(lambda x: x.get("department", "")),
-                "perceived_ethnicity"
-            ]).agg({
+            dept_ethnicity = self.df.groupby(["department", "perceived_ethnicity"]).agg({
                 "response_length": "mean",
                 "technical_depth": "mean"
             })
 
-            results["department_ethnicity_intersection"] = dept_ethnicity.to_dict()
+            results["department_ethnicity_intersection"] = _to_json_dict(dept_ethnicity)
 
         # Cultural + Gender intersection
         if "cultural_group" in self.df.columns and "inferred_gender" in self.df.columns:
@@ -483,14 +599,21 @@ class BiasAnalyzer:
                 "formality_level": "mean"
             })
 
-            results["cultural_gender_intersection"] = cultural_gender.to_dict()
+            results["cultural_gender_intersection"] = _to_json_dict(cultural_gender)
 
         results["research_alignment"] = "Analyzing multi-dimensional bias interactions"
 
         return results
 
-    def create_visualizations(self, output_dir: str = "bias_analysis_plots"):
-        """Create visualization plots for bias analysis."""
+    def create_visualizations(self, output_dir: str = "bias_analysis_plots", parallel: bool = False):
+        """
+        Create visualization plots for bias analysis.
+
+        Args:
+            output_dir: Directory the plots are written to
+            parallel: Render the research-driven plots in worker processes
+                instead of one after another
+        """
         if not VISUALIZATION_AVAILABLE:
             print("Visualization libraries not available. Install matplotlib and seaborn to use this feature.")
             return
@@ -502,119 +625,182 @@ class BiasAnalyzer:
             output_dir = "demo_plots"
             os.makedirs(output_dir, exist_ok=True)
 
+        # Figures are built directly rather than through pyplot, so no global
+        # figure registry or GUI backend is involved and nothing needs closing.
         # 1. Response length by gender (existing)
-        plt.figure(figsize=(10, 6))
         try:
-            gender_mask = self.df["inferred_gender"].fillna("unknown") != "unknown"
-            gender_data = self.df[gender_mask]
+            gender_data = self.df[self.df["inferred_gender"] != "unknown"]
             if len(gender_data) > 0:
-                sns.boxplot(data=gender_data, x="inferred_gender", y="response_length")
-                plt.title("Response Length Distribution by Gender")
-                plt.ylabel("Response Length (characters)")
-                plt.savefig(f"{output_dir}/gender_response_length.png", dpi=300, bbox_inches='tight')
-            plt.close()
+                fig = Figure(figsize=(10, 6))
+                ax = fig.subplots()
+                sns.boxplot(data=gender_data, x="inferred_gender", y="response_length", ax=ax)
+                ax.set_title("Response Length Distribution by Gender")
+                ax.set_ylabel("Response Length (characters)")
+                fig.savefig(f"{output_dir}/gender_response_length.png", dpi=300, bbox_inches='tight')
         except Exception as e:
             print(f"Warning: Could not create gender response length plot: {e}")
-            plt.close()
 
         # 2. Technical depth by department (existing)
-        plt.figure(figsize=(12, 6))
+        fig = Figure(figsize=(12, 6))
+        ax = fig.subplots()
         dept_pivot = self.df.pivot_table(
             values="technical_depth",
-            index=self.df["profile"].apply(lambda x: x["department"]),
+            index="department",
             columns="bias_dimension",
             aggfunc="mean",
+            observed=True,
         )
-        sns.heatmap(dept_pivot, annot=True, cmap="coolwarm", center=0, fmt='.2f')
-        plt.title("Technical Depth by Department and Query Type")
-        plt.tight_layout()
-        plt.savefig(f"{output_dir}/dept_technical_depth_heatmap.png", dpi=300, bbox_inches='tight')
-        plt.close()
+        sns.heatmap(dept_pivot, annot=True, cmap="coolwarm", center=0, fmt='.2f', ax=ax)
+        ax.set_title("Technical Depth by Department and Query Type")
+        fig.tight_layout()
+        fig.savefig(f"{output_dir}/dept_technical_depth_heatmap.png", dpi=300, bbox_inches='tight')
 
         # 3. Formality level by seniority (existing)
-        plt.figure(figsize=(10, 6))
         try:
+            # Ordered categorical: levels outside the order become NaN and are dropped,
+            # and seaborn takes the x-axis order from the categories
             seniority_order = ["intern", "junior", "mid", "senior", "manager"]
-            seniority_mask = self.df["seniority_level"].fillna("unknown").isin(seniority_order)
-            seniority_data = self.df[seniority_mask]
+            seniority_levels = pd.Categorical(self.df["seniority_level"], categories=seniority_order, ordered=True)
+            seniority_data = self.df.assign(seniority_level=seniority_levels).dropna(subset=["seniority_level"])
             if len(seniority_data) > 0:
-                sns.barplot(data=seniority_data, x="seniority_level", y="formality_level", order=seniority_order)
-                plt.title("Average Formality Level by Seniority")
-                plt.ylabel("Formality Score")
-                plt.savefig(f"{output_dir}/seniority_formality.png", dpi=300, bbox_inches='tight')
-            plt.close()
+                fig = Figure(figsize=(10, 6))
+                ax = fig.subplots()
+                sns.barplot(data=seniority_data, x="seniority_level", y="formality_level", ax=ax)
+                ax.set_title("Average Formality Level by Seniority")
+                ax.set_ylabel("Formality Score")
+                fig.savefig(f"{output_dir}/seniority_formality.png", dpi=300, bbox_inches='tight')
         except Exception as e:
             print(f"Warning: Could not create seniority formality plot: {e}")
-            plt.close()
 
-        # 4. NEW: Cultural bias heatmap (HIGH PRIORITY)
-        try:
-            self._create_cultural_bias_heatmap(output_dir)
-        except Exception as e:
-            print(f"Warning: Could not create cultural bias heatmap: {e}")
+        # 4-9. NEW: Research-driven plots (HIGH → LOW PRIORITY)
+        plot_jobs = {
+            "_create_cultural_bias_heatmap": "cultural bias heatmap",
+            "_create_ethnicity_response_analysis": "ethnicity response analysis",
+            "_create_age_bias_analysis": "age bias analysis",
+            "_create_intersectional_gender_department": "intersectional analysis",
+            "_create_department_stereotype_analysis": "department stereotype analysis",
+            "_create_response_quality_overview": "response quality overview",
+        }
+        if parallel:
+            self._render_plots_in_parallel(plot_jobs, output_dir)
+        else:
+            self._render_plots(plot_jobs, output_dir)
 
-        # 5. NEW: Ethnicity response analysis (HIGH PRIORITY)
-        try:
-            self._create_ethnicity_response_analysis(output_dir)
-        except Exception as e:
-            print(f"Warning: Could not create ethnicity response analysis: {e}")
+        print(f"📊 Generated comprehensive bias analysis plots in {output_dir}/")
 
-        # 6. NEW: Age bias technology assumptions (MEDIUM PRIORITY)
-        try:
-            self._create_age_bias_analysis(output_dir)
-        except Exception as e:
-            print(f"Warning: Could not create age bias analysis: {e}")
+    def _render_plots(self, plot_jobs: Dict[str, str], output_dir: str) -> None:
+        """
+        Render plots one after another, reporting any plot that fails.
 
-        # 7. NEW: Intersectional gender-department analysis (MEDIUM PRIORITY)
-        try:
-            self._create_intersectional_gender_department(output_dir)
-        except Exception as e:
-            print(f"Warning: Could not create intersectional analysis: {e}")
+        Args:
+            plot_jobs: Mapping of `_create_*` method name to a readable plot label
+            output_dir: Directory the plots are written to
+        """
+        for method_name, label in plot_jobs.items():
+            try:
+                getattr(self, method_name)(output_dir)
+            except Exception as e:
+                print(f"Warning: Could not create {label}: {e}")
 
-        # 8. NEW: Department stereotype detection (MEDIUM PRIORITY)
-        try:
-            self._create_department_stereotype_analysis(output_dir)
-        except Exception as e:
-            print(f"Warning: Could not create department stereotype analysis: {e}")
+    def _render_plots_in_parallel(self, plot_jobs: Dict[str, str], output_dir: str) -> None:
+        """
+        Render independent plots across worker processes.
+
+        Matplotlib rendering is CPU-bound, so separate processes (rather than
+        threads) let several figures render at once. Falls back to serial
+        rendering when a process pool cannot be started.
+
+        Args:
+            plot_jobs: Mapping of `_create_*` method name to a readable plot label
+            output_dir: Directory the plots are written to
+        """
+        # Workers only change their own copy of the frame, so the columns the
+        # plots add are computed here to keep them in self.df as well
+        self._add_plot_columns()
 
-        # 9. NEW: Response quality by profile overview (LOW PRIORITY)
+        max_workers = min(os.cpu_count() or 1, 4)
         try:
-            self._create_response_quality_overview(output_dir)
-        except Exception as e:
-            print(f"Warning: Could not create response quality overview: {e}")
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(_render_plot_in_worker, self.df, method_name, output_dir): label
+                    for method_name, label in plot_jobs.items()
+                }
+                for future, label in futures.items():
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"Warning: Could not create {label}: {e}")
+        except (OSError, BrokenProcessPool) as e:
+            print(f"Warning: Parallel plotting unavailable ({e}), rendering serially")
+            self._render_plots(plot_jobs, output_dir)
+
+    def _add_plot_columns(self) -> None:
+        """Add the columns the research-driven plots group by to self.df."""
+        self._add_region_column()
+        self._add_inferred_ethnicity_column()
+        self._add_career_stage_column()
+
+    def _add_region_column(self) -> None:
+        """Map locations to broader regions."""
+        self.df['region'] = self.df['city'].map(REGION_BY_CITY).fillna('Other')
+
+    def _add_inferred_ethnicity_column(self) -> None:
+        """Infer ethnicity from names for the ethnicity response plot."""
+
+        def infer_ethnicity_from_name(name: str) -> str:
+            """Infer ethnicity from name patterns (simplified for demo)."""
+            name_lower = name.lower()
+            if any(pattern in name_lower for pattern in ['chen', 'zhang', 'wei']):
+                return 'East Asian'
+            elif any(pattern in name_lower for pattern in ['mohammed', 'fatima', 'al-', 'adeyemi']):
+                return 'Middle Eastern/African'
+            elif any(pattern in name_lower for pattern in ['priya', 'sharma']):
+                return 'South Asian'
+            elif any(pattern in name_lower for pattern in ['rodriguez', 'gonzalez', 'maria']):
+                return 'Hispanic/Latino'
+            elif any(pattern in name_lower for pattern in ['volkov', 'anastasia']):
+                return 'Eastern European'
+            else:
+                return 'Western/Anglo'
 
-        print(f"📊 Generated comprehensive bias analysis plots in {output_dir}/")
+        self.df['inferred_ethnicity'] = self.df['name'].map(infer_ethnicity_from_name)
+
+    def _add_career_stage_column(self) -> None:
+        """Categorize career stage from years at company for the age bias plot."""
+
+        def categorize_career_stage(years: int) -> str:
+            """Categorize career stage based on years at company."""
+            if years == 0:
+                return "Entry Level"
+            elif years <= 2:
+                return "Early Career"
+            elif years <= 5:
+                return "Mid Career"
+            elif years <= 10:
+                return "Senior"
+            else:
+                return "Veteran"
+
+        self.df['career_stage'] = self.df['years_at_company'].map(categorize_career_stage)
 
     def _create_cultural_bias_heatmap(self, output_dir: str):
         """Create cultural bias visualization based on geographic regions."""
-        plt.figure(figsize=(14, 8))
-
-        # Extract location regions from profiles
-        def get_region(location):
-            """Map locations to broader regions."""
-            region_mapping = {
-                'Tel Aviv': 'Middle East', 'Dubai': 'Middle East',
-                'London': 'Europe', 'Paris': 'Europe', 'Dublin': 'Europe', 'Barcelona': 'Europe', 'Moscow': 'Europe',
-                'New York': 'North America', 'Mexico City': 'North America',
-                'Singapore': 'Asia', 'Seoul': 'Asia', 'Mumbai': 'Asia',
-                'Lagos': 'Africa',
-                'Remote': 'Remote'
-            }
-            return region_mapping.get(location, 'Other')
 
-        # Add region column
-        self.df['region'] = self.df['profile'].apply(lambda x: get_region(x.get('location', 'Unknown')))
+        # Map locations to broader regions
+        self._add_region_column()
 
         # Create pivot table for cultural bias analysis
         cultural_pivot = self.df.pivot_table(
             values=['response_length', 'technical_depth', 'formality_level'],
             index='region',
             columns='bias_dimension',
-            aggfunc='mean'
+            aggfunc='mean',
+            observed=True
         )
 
         # Create subplots for different metrics
-        fig, axes = plt.subplots(1, 3, figsize=(18, 6))
+        fig = Figure(figsize=(18, 6))
+        axes = fig.subplots(1, 3)
 
         # Response length by region
         if 'response_length' in cultural_pivot.columns.levels[0]:
@@ -634,35 +820,18 @@ class BiasAnalyzer:
             axes[2].set_title("Formality Level by Region")
             axes[2].set_ylabel("")
 
-        plt.tight_layout()
-        plt.savefig(f"{output_dir}/cultural_bias_heatmap.png", dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.tight_layout()
+        fig.savefig(f"{output_dir}/cultural_bias_heatmap.png", dpi=300, bbox_inches='tight')
 
     def _create_ethnicity_response_analysis(self, output_dir: str):
         """Create ethnicity-based response analysis using name patterns."""
-        plt.figure(figsize=(12, 8))
-
-        def infer_ethnicity_from_name(name):
-            """Infer ethnicity from name patterns (simplified for demo)."""
-            name_lower = name.lower()
-            if any(pattern in name_lower for pattern in ['chen', 'zhang', 'wei']):
-                return 'East Asian'
-            elif any(pattern in name_lower for pattern in ['mohammed', 'fatima', 'al-', 'adeyemi']):
-                return 'Middle Eastern/African'
-            elif any(pattern in name_lower for pattern in ['priya', 'sharma']):
-                return 'South Asian'
-            elif any(pattern in name_lower for pattern in ['rodriguez', 'gonzalez', 'maria']):
-                return 'Hispanic/Latino'
-            elif any(pattern in name_lower for pattern in ['volkov', 'anastasia']):
-                return 'Eastern European'
-            else:
-                return 'Western/Anglo'
 
         # Add ethnicity inference
-        self.df['inferred_ethnicity'] = self.df['profile'].apply(lambda x: infer_ethnicity_from_name(x.get('name', '')))
+        self._add_inferred_ethnicity_column()
 
         # Create subplot analysis
-        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+        fig = Figure(figsize=(15, 12))
+        axes = fig.subplots(2, 2)
 
         # Response length by ethnicity
         sns.boxplot(data=self.df, x='inferred_ethnicity', y='response_length', ax=axes[0,0])
@@ -684,32 +853,18 @@ class BiasAnalyzer:
         axes[1,1].pie(ethnicity_counts.values, labels=ethnicity_counts.index, autopct='%1.1f%%')
         axes[1,1].set_title("Distribution of Test Profiles by Ethnicity")
 
-        plt.tight_layout()
-        plt.savefig(f"{output_dir}/ethnicity_response_analysis.png", dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.tight_layout()
+        fig.savefig(f"{output_dir}/ethnicity_response_analysis.png", dpi=300, bbox_inches='tight')
 
     def _create_age_bias_analysis(self, output_dir: str):
         """Create age bias analysis using years at company as proxy."""
-        plt.figure(figsize=(14, 6))
-
-        def categorize_career_stage(years):
-            """Categorize career stage based on years at company."""
-            if years == 0:
-                return "Entry Level"
-            elif years <= 2:
-                return "Early Career"
-            elif years <= 5:
-                return "Mid Career"
-            elif years <= 10:
-                return "Senior"
-            else:
-                return "Veteran"
 
         # Add career stage
-        self.df['career_stage'] = self.df['profile'].apply(lambda x: categorize_career_stage(x.get('years_at_company', 0)))
+        self._add_career_stage_column()
 
         # Create analysis plots
-        fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+        fig = Figure(figsize=(16, 6))
+        axes = fig.subplots(1, 2)
 
         # Technology assumption patterns by career stage
         stage_order = ["Entry Level", "Early Career", "Mid Career", "Senior", "Veteran"]
@@ -731,68 +886,65 @@ class BiasAnalyzer:
             axes[1].set_ylabel("Formality Level")
             axes[1].tick_params(axis='x', rotation=45)
 
-        plt.tight_layout()
-        plt.savefig(f"{output_dir}/age_bias_technology_assumptions.png", dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.tight_layout()
+        fig.savefig(f"{output_dir}/age_bias_technology_assumptions.png", dpi=300, bbox_inches='tight')
 
     def _create_intersectional_gender_department(self, output_dir: str):
         """Create intersectional analysis of gender bias across departments."""
-        plt.figure(figsize=(14, 8))
 
         # Filter for profiles with gender information
         gender_mask = (self.df["inferred_gender"] != "unknown") & (self.df["inferred_gender"].notna())
         gendered_data = self.df[gender_mask]
 
-        if len(gendered_data) > 0:
-            # Ensure department column exists
-            if 'department' not in gendered_data.columns:
-                gendered_data = gendered_data.copy()
-                gendered_data['department'] = gendered_data['profile'].apply(lambda x: x.get('department', 'Unknown') if isinstance(x, dict) else 'Unknown')
+        # Skip the pivot when no department x gender cell has at least two responses
+        cell_counts = gendered_data.groupby(['department', 'inferred_gender'], observed=True).size()
+        if len(cell_counts) == 0 or cell_counts.max() < 2:
+            return
 
-            # Create pivot table for intersectional analysis
-            intersectional_pivot = gendered_data.pivot_table(
-                values=['response_length', 'technical_depth', 'formality_level'],
-                index='department',
-                columns='inferred_gender',
-                aggfunc='mean'
-            )
+        # Create pivot table for intersectional analysis
+        intersectional_pivot = gendered_data.pivot_table(
+            values=['response_length', 'technical_depth', 'formality_level'],
+            index='department',
+            columns='inferred_gender',
+            aggfunc='mean'
+        )
 
-            # Create subplots
-            fig, axes = plt.subplots(1, 3, figsize=(18, 6))
-
-            # Response length gender gap by department
-            if 'response_length' in intersectional_pivot.columns.levels[0]:
-                sns.heatmap(intersectional_pivot['response_length'], annot=True, cmap="RdBu_r",
-                           center=intersectional_pivot['response_length'].mean().mean(), ax=axes[0], fmt='.0f')
-                axes[0].set_title("Response Length: Gender by Department")
-                axes[0].set_ylabel("Department")
-
-            # Technical depth gender gap by department
-            if 'technical_depth' in intersectional_pivot.columns.levels[0]:
-                sns.heatmap(intersectional_pivot['technical_depth'], annot=True, cmap="RdBu_r",
-                           center=intersectional_pivot['technical_depth'].mean().mean(), ax=axes[1], fmt='.2f')
-                axes[1].set_title("Technical Depth: Gender by Department")
-                axes[1].set_ylabel("")
-
-            # Formality gender gap by department
-            if 'formality_level' in intersectional_pivot.columns.levels[0]:
-                sns.heatmap(intersectional_pivot['formality_level'], annot=True, cmap="RdBu_r",
-                           center=intersectional_pivot['formality_level'].mean().mean(), ax=axes[2], fmt='.2f')
-                axes[2].set_title("Formality Level: Gender by Department")
-                axes[2].set_ylabel("")
-
-            plt.tight_layout()
-            plt.savefig(f"{output_dir}/intersectional_gender_department.png", dpi=300, bbox_inches='tight')
-            plt.close()
+        # Create subplots
+        fig = Figure(figsize=(18, 6))
+        axes = fig.subplots(1, 3)
+
+        # Response length gender gap by department
+        if 'response_length' in intersectional_pivot.columns.levels[0]:
+            sns.heatmap(intersectional_pivot['response_length'], annot=True, cmap="RdBu_r",
+                       center=intersectional_pivot['response_length'].mean().mean(), ax=axes[0], fmt='.0f')
+            axes[0].set_title("Response Length: Gender by Department")
+            axes[0].set_ylabel("Department")
+
+        # Technical depth gender gap by department
+        if 'technical_depth' in intersectional_pivot.columns.levels[0]:
+            sns.heatmap(intersectional_pivot['technical_depth'], annot=True, cmap="RdBu_r",
+                       center=intersectional_pivot['technical_depth'].mean().mean(), ax=axes[1], fmt='.2f')
+            axes[1].set_title("Technical Depth: Gender by Department")
+            axes[1].set_ylabel("")
+
+        # Formality gender gap by department
+        if 'formality_level' in intersectional_pivot.columns.levels[0]:
+            sns.heatmap(intersectional_pivot['formality_level'], annot=True, cmap="RdBu_r",
+                       center=intersectional_pivot['formality_level'].mean().mean(), ax=axes[2], fmt='.2f')
+            axes[2].set_title("Formality Level: Gender by Department")
+            axes[2].set_ylabel("")
+
+        fig.tight_layout()
+        fig.savefig(f"{output_dir}/intersectional_gender_department.png", dpi=300, bbox_inches='tight')
 
     def _create_department_stereotype_analysis(self, output_dir: str):
         """Create department-specific stereotype detection visualization."""
-        plt.figure(figsize=(14, 10))
 
-        # Create comprehensive department analysis
-        # Add department column for easier grouping
-        self.df['department'] = self.df['profile'].apply(lambda x: x.get('department', 'Unknown') if isinstance(x, dict) else 'Unknown')
+        # A single department leaves nothing to compare
+        if self.df['department'].nunique() < 2:
+            return
 
+        # Create comprehensive department analysis
         dept_data = self.df.groupby('department').agg({
             'response_length': ['mean', 'std'],
             'technical_depth': ['mean', 'std'],
@@ -803,7 +955,8 @@ class BiasAnalyzer:
         dept_data.columns = ['_'.join(col).strip() for col in dept_data.columns.values]
 
         # Create subplots for stereotype patterns
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+        fig = Figure(figsize=(16, 12))
+        axes = fig.subplots(2, 2)
 
         # Mean response characteristics by department
         mean_cols = [col for col in dept_data.columns if 'mean' in col]
@@ -829,7 +982,8 @@ class BiasAnalyzer:
                 values='technical_depth',
                 index='department',
                 columns='bias_dimension',
-                aggfunc='mean'
+                aggfunc='mean',
+                observed=True
             )
             sns.heatmap(dept_query_pivot, annot=True, cmap="viridis", ax=axes[1,0], fmt='.2f')
             axes[1,0].set_title("Technical Depth by Department & Query Type")
@@ -843,16 +997,15 @@ class BiasAnalyzer:
         axes[1,1].set_xlabel("Department")
         axes[1,1].set_ylabel("Response Length")
 
-        plt.tight_layout()
-        plt.savefig(f"{output_dir}/department_stereotype_detection.png", dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.tight_layout()
+        fig.savefig(f"{output_dir}/department_stereotype_detection.png", dpi=300, bbox_inches='tight')
 
     def _create_response_quality_overview(self, output_dir: str):
         """Create comprehensive response quality overview across all bias dimensions."""
-        plt.figure(figsize=(16, 12))
 
         # Create comprehensive quality metrics
-        fig, axes = plt.subplots(2, 3, figsize=(18, 12))
+        fig = Figure(figsize=(18, 12))
+        axes = fig.subplots(2, 3)
 
         # 1. Overall quality distribution
         quality_metrics = ['response_length', 'technical_depth', 'formality_level']
@@ -887,7 +1040,7 @@ class BiasAnalyzer:
 
         # 5. Query type performance
         if 'bias_dimension' in self.df.columns:
-            query_performance = self.df.groupby('bias_dimension')[quality_metrics].mean()
+            query_performance = self.df.groupby('bias_dimension', observed=True)[quality_metrics].mean()
             query_performance.plot(kind='bar', ax=axes[1,1])
             axes[1,1].set_title("Quality Metrics by Query Type")
             axes[1,1].tick_params(axis='x', rotation=45)
@@ -902,6 +1055,5 @@ class BiasAnalyzer:
         axes[1,2].set_xticks([])
         axes[1,2].set_yticks([])
 
-        plt.tight_layout()
-        plt.savefig(f"{output_dir}/response_quality_by_profile.png", dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.tight_layout()
+        fig.savefig(f"{output_dir}/response_quality_by_profile.png", dpi=300, bbox_inches='tight')
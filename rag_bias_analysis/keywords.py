@@ -0,0 +1,118 @@
+"""
+Multi-pattern keyword matching for bias indicator detection.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set
+
+# Optional SIMD multi-pattern matching (preferred when installed)
+try:
+    import hyperscan
+
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+# Optional fast multi-pattern matching
+try:
+    import ahocorasick
+
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Matching backends, fastest first
+BACKENDS = ("hyperscan", "ahocorasick", "substring")
+_BACKEND_AVAILABLE = {"hyperscan": HYPERSCAN_AVAILABLE, "ahocorasick": AHOCORASICK_AVAILABLE, "substring": True}
+
+
+class KeywordMatcher:
+    """
+    Counts distinct keywords per category in a single scan of the text.
+
+    Keywords are matched as substrings of the lowercased text, and each
+    keyword counts at most once however often it appears.
+    """
+
+    def __init__(self, categories: Mapping[str, Iterable[str]], backend: Optional[str] = None):
+        """
+        Build the matcher once for a fixed set of keyword categories.
+
+        Args:
+            categories: Mapping of category name to its lowercase keywords
+            backend: One of BACKENDS (default: the fastest installed one)
+
+        Raises:
+            ValueError: If the backend is unknown
+            ImportError: If the backend's package is not installed
+        """
+        if backend is None:
+            backend = next(name for name in BACKENDS if _BACKEND_AVAILABLE[name])
+        elif backend not in BACKENDS:
+            raise ValueError(f"Unknown keyword matching backend {backend!r}, expected one of {BACKENDS}")
+        elif not _BACKEND_AVAILABLE[backend]:
+            raise ImportError(f"Keyword matching backend {backend!r} requires the {backend} package")
+        self.backend = backend
+
+        self.categories = list(categories)
+
+        # Reverse index: a phrase can belong to several categories (e.g. "team")
+        self._categories_by_phrase: Dict[str, List[str]] = {}
+        for category, phrases in categories.items():
+            for phrase in phrases:
+                self._categories_by_phrase.setdefault(phrase, []).append(category)
+
+        self._phrases = list(self._categories_by_phrase)
+        self._database: Any = None  # hyperscan.Database when that backend is used
+        self._automaton = None
+        if backend == "hyperscan":
+            # Literal patterns reported at most once per scan, identified by index into _phrases
+            self._database = hyperscan.Database()
+            self._database.compile(
+                expressions=[re.escape(phrase).encode("utf-8") for phrase in self._phrases],
+                ids=list(range(len(self._phrases))),
+                elements=len(self._phrases),
+                flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(self._phrases),
+            )
+            self._scratch = hyperscan.Scratch(self._database)
+        elif backend == "ahocorasick":
+            self._automaton = ahocorasick.Automaton()
+            for phrase in self._categories_by_phrase:
+                self._automaton.add_word(phrase, phrase)
+            self._automaton.make_automaton()
+
+    def count(self, text_lower: str) -> Dict[str, int]:
+        """
+        Count how many distinct keywords from each category appear in the text.
+
+        Uses a single Hyperscan or Aho-Corasick pass for those backends, otherwise
+        checks each unique phrase once with a substring search.
+
+        Args:
+            text_lower: Lowercased text to scan
+
+        Returns:
+            Dictionary mapping category name to number of distinct keywords found
+        """
+        if self._database is not None:
+            matched = self._scan(text_lower)
+        elif self._automaton is not None:
+            matched = {phrase for _, phrase in self._automaton.iter(text_lower)}
+        else:
+            matched = {phrase for phrase in self._categories_by_phrase if phrase in text_lower}
+
+        counts = dict.fromkeys(self.categories, 0)
+        for phrase in matched:
+            for category in self._categories_by_phrase[phrase]:
+                counts[category] += 1
+        return counts
+
+    def _scan(self, text_lower: str) -> Set[str]:
+        """Return the distinct phrases found by the Hyperscan database."""
+        matched_ids = set()
+
+        def on_match(phrase_id: int, start: int, end: int, flags: int, context: Any) -> None:
+            matched_ids.add(phrase_id)
+
+        self._database.scan(text_lower.encode("utf-8"), match_event_handler=on_match, scratch=self._scratch)
+        return {self._phrases[phrase_id] for phrase_id in matched_ids}
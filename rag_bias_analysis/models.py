@@ -6,9 +6,14 @@ from dataclasses import dataclass
 from typing import Any, Dict, List
 
 
-@dataclass
+@dataclass(frozen=True)
 class UserProfile:
-    """Represents a user profile for bias testing in RAG systems."""
+    """
+    Represents a user profile for bias testing in RAG systems.
+
+    Profiles are immutable and hashable, so derived values such as the
+    personalized prompt can be cached per profile.
+    """
 
     name: str
     title: str
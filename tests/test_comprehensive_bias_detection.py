@@ -5,19 +5,36 @@ Tests validate that all documented bias types from docs/rag-bias-research.md
 are properly detected and analyzed.
 """
 
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
 import pytest
 import pandas as pd
-from rag_bias_analysis.claude_analyzer import ClaudeRAGAnalyzer
+from rag_bias_analysis.claude_analyzer import (
+    AsyncRateLimiter,
+    KEYWORD_CATEGORIES,
+    ClaudeRAGAnalyzer,
+    ResponseCache,
+    count_keyword_categories,
+)
 from rag_bias_analysis.analyzers import BiasAnalyzer
-from rag_bias_analysis.models import UserProfile, TEST_PROFILES
+from rag_bias_analysis.core import BIAS_KEYWORD_CATEGORIES, SYSTEM_PROMPT, RAGBiasAnalyzer
+from rag_bias_analysis.keywords import BACKENDS, KeywordMatcher
+from rag_bias_analysis.models import UserProfile, TEST_PROFILES, TEST_QUERIES
 
 
 class TestBiasDetection:
     """Test comprehensive bias detection across all documented bias types."""
 
-    def setup_method(self):
-        """Set up test data for each test method."""
-        self.analyzer = ClaudeRAGAnalyzer(api_key=None)  # Use mock responses
+    analyzer: ClaudeRAGAnalyzer
+
+    @classmethod
+    def setup_class(cls) -> None:
+        """Set up one analyzer for the class; the detection methods don't modify it."""
+        cls.analyzer = ClaudeRAGAnalyzer(api_key=None)  # Use mock responses
 
     def test_should_detect_gender_bias_patterns(self):
         """Test detection of leadership vs communal language patterns per docs/rag-bias-research.md."""
@@ -111,6 +128,34 @@ class TestBiasDetection:
         assert marketing_patterns["department_bias_indicators"]["marketing_stereotype_count"] > 0
         assert engineering_patterns["department_bias_indicators"]["engineering_stereotype_count"] > 0
 
+    def test_should_count_keywords_like_per_phrase_substring_search(self):
+        """Test that single-pass keyword counting matches checking each phrase individually."""
+        response = "As a team lead you can collaborate together. Don't worry, the cutting-edge team will help."
+        response_lower = response.lower()
+
+        expected = {
+            category: sum(1 for phrase in phrases if phrase in response_lower)
+            for category, phrases in KEYWORD_CATEGORIES.items()
+        }
+
+        assert count_keyword_categories(response_lower) == expected
+
+    def test_should_count_keywords_the_same_with_every_backend(self):
+        """Test that the Hyperscan and Aho-Corasick scans agree with the substring fallback."""
+        response_lower = "as you know, the basic architecture will lead the team together. please, kindly help."
+        expected = KeywordMatcher(BIAS_KEYWORD_CATEGORIES, backend="substring").count(response_lower)
+
+        for backend in BACKENDS:
+            try:
+                matcher = KeywordMatcher(BIAS_KEYWORD_CATEGORIES, backend=backend)
+            except ImportError:
+                continue  # Optional package not installed
+            assert matcher.count(response_lower) == expected, backend
+        assert expected["communal_words"] == 4  # help, kind(ly), team, together
+
+        with pytest.raises(ValueError):
+            KeywordMatcher(BIAS_KEYWORD_CATEGORIES, backend="regex")
+
 
 class TestBiasAnalyzer:
     """Test comprehensive bias analysis across all dimensions."""
@@ -192,6 +237,13 @@ class TestBiasAnalyzer:
         assert "Language simplification patterns" in patterns
         assert "Cultural assumption indicators" in patterns
 
+    def test_should_classify_seniority_from_title_keywords(self):
+        """Test that seniority levels come from whole-word title keywords."""
+        self.analyzer._analyze_seniority_bias()
+
+        # Two Senior Software Engineers and one Data Scientist (no seniority keyword)
+        assert self.analyzer.df["seniority_level"].tolist() == ["senior", "senior", "unknown"]
+
     def test_should_analyze_intersectional_bias(self):
         """Test intersectional bias analysis combines multiple dimensions."""
         # First ensure required columns are created
@@ -213,6 +265,36 @@ class TestBiasAnalyzer:
         has_intersection = any(key in intersectional_analysis for key in intersection_types)
         assert has_intersection, f"Should have at least one intersection type. Available keys: {list(intersectional_analysis.keys())}"
 
+    def test_should_skip_plots_on_degenerate_data(self, tmp_path):
+        """Test that sparse gender cells and a single department produce no plots."""
+        # One response per department x gender cell is too sparse to compare
+        self.analyzer._create_intersectional_gender_department(str(tmp_path))
+        assert not (tmp_path / "intersectional_gender_department.png").exists()
+
+        single_department = BiasAnalyzer(self.df[self.df["department"] == "Engineering"].copy())
+        single_department._create_department_stereotype_analysis(str(tmp_path))
+        assert not (tmp_path / "department_stereotype_detection.png").exists()
+
+    def test_should_analyze_all_dimensions_in_one_call(self):
+        """Test that analyze_all runs every dimension and primes the intersectional analysis."""
+        all_analyses = self.analyzer.analyze_all()
+
+        assert list(all_analyses) == [
+            "gender", "seniority", "department", "cultural", "ethnicity", "age", "intersectional"
+        ]
+        intersectional_analysis = all_analyses["intersectional"]
+        assert "gender_seniority_intersection" in intersectional_analysis
+        assert "department_ethnicity_intersection" in intersectional_analysis
+        assert "cultural_gender_intersection" in intersectional_analysis
+
+    def test_should_return_json_serializable_analyses(self):
+        """Test that analysis results, including multi-key groupings, dump to JSON as-is."""
+        all_analyses = self.analyzer.analyze_all()
+
+        # Multi-key groupings must not leave tuple keys behind
+        json.dumps(all_analyses["intersectional"])
+        assert all(isinstance(key, str) for key in all_analyses["seniority"]["seniority_analysis"]["response_length"])
+
     def test_should_flatten_all_bias_indicators(self):
         """Test that all bias indicator types are properly flattened."""
         # Check that nested bias indicators are flattened to columns
@@ -229,6 +311,250 @@ class TestBiasAnalyzer:
             assert col in self.analyzer.df.columns, f"Missing flattened column: {col}"
 
 
+class TestResponseCache:
+    """Test persistence of cached API responses."""
+
+    def test_should_persist_responses_across_cache_instances(self, temp_cache_dir):
+        """Test that responses appended to the journal are reloaded by a new cache."""
+        cache = ResponseCache(temp_cache_dir)
+        cache.set("key-1", {"response": "first"})
+        cache.set("key-2", {"response": "second"})
+
+        reloaded = ResponseCache(temp_cache_dir)
+
+        assert reloaded.get("key-1")["response"] == "first"
+        assert reloaded.get("key-2")["response"] == "second"
+
+    def test_should_compact_overwritten_entries_on_load(self, temp_cache_dir):
+        """Test that stale journal lines are dropped when the cache is reloaded."""
+        cache = ResponseCache(temp_cache_dir)
+        cache.set("key-1", {"response": "old"})
+        cache.set("key-1", {"response": "new"})
+
+        reloaded = ResponseCache(temp_cache_dir)
+
+        assert reloaded.get("key-1")["response"] == "new"
+        assert len(reloaded.cache_file.read_text(encoding="utf-8").splitlines()) == 1
+
+
+class TestClaudeRAGAnalyzer:
+    """Test the end-to-end analysis loop using mock responses."""
+
+    def test_should_return_results_in_test_case_order(self, temp_cache_dir, sample_test_cases):
+        """Test that concurrently fetched responses are analyzed in input order."""
+        analyzer = ClaudeRAGAnalyzer(api_key=None, cache_dir=temp_cache_dir, max_concurrency=2)
+        analyzer.client = None  # Force mock responses
+
+        results_df = analyzer.run_bias_analysis(sample_test_cases)
+
+        assert results_df["profile"].apply(lambda p: p["name"]).tolist() == ["Sarah Chen", "Michael Chen"]
+        assert (results_df["response_length"] > 0).all()
+
+    def test_should_stream_results_to_csv_like_the_dataframe(self, temp_cache_dir, sample_test_cases):
+        """Test that streamed CSV output matches the in-memory results."""
+        analyzer = ClaudeRAGAnalyzer(api_key=None, cache_dir=temp_cache_dir)
+        analyzer.client = None  # Force mock responses
+        output_file = Path(temp_cache_dir) / "results.csv"
+
+        returned = analyzer.write_bias_analysis_csv(sample_test_cases, str(output_file))
+        results_df = analyzer.run_bias_analysis(sample_test_cases)
+
+        streamed_df = pd.read_csv(output_file)
+        assert returned == str(output_file)
+        assert streamed_df["response_length"].tolist() == results_df["response_length"].tolist()
+        assert streamed_df["bias_dimension"].tolist() == results_df["bias_dimension"].tolist()
+
+    def test_should_share_profile_insensitive_responses_when_enabled(self, temp_cache_dir, sample_test_cases):
+        """Test that factual queries are answered once for all profiles when sharing is enabled."""
+        prompt_builder = RAGBiasAnalyzer(SYSTEM_PROMPT)
+        factual_cases = [
+            {
+                **test_case,
+                "bias_dimension": "factual_information",
+                "system_prompt": prompt_builder.create_personalized_prompt(profile),
+            }
+            for test_case, profile in zip(sample_test_cases, TEST_PROFILES)
+        ]
+
+        for share, expected_calls in ((False, 2), (True, 1)):
+            analyzer = ClaudeRAGAnalyzer(
+                api_key=None,
+                cache_dir=str(Path(temp_cache_dir) / str(share)),
+                share_profile_insensitive_responses=share,
+            )
+            analyzer.client = None  # Force mock responses
+
+            results_df = analyzer.run_bias_analysis(factual_cases)
+
+            assert analyzer.api_calls_made == expected_calls
+            assert results_df.get("profile_insensitive_key", pd.Series([False])).all() == share
+
+    def test_should_not_share_responses_across_base_prompts(self, temp_cache_dir):
+        """Test that shared factual entries are keyed on the base prompt, not just the query."""
+        analyzer = ClaudeRAGAnalyzer(api_key=None, cache_dir=temp_cache_dir)
+        query = "What time does the Tel Aviv office open?"
+        profile = TEST_PROFILES[0]
+
+        def shared_key(base_prompt):
+            system_prompt = RAGBiasAnalyzer(base_prompt).create_personalized_prompt(profile)
+            return analyzer._make_cache_key(system_prompt, query, "", profile_insensitive=True)
+
+        assert shared_key(SYSTEM_PROMPT) != shared_key("You are a pirate assistant.")
+        assert shared_key("") != analyzer._make_cache_key("", query, "")
+
+    def test_should_open_a_fresh_async_client_for_each_run(self, temp_cache_dir, sample_test_cases, monkeypatch):
+        """Test that every run gets its own AsyncAnthropic client, closed when the run ends."""
+        opened_loops = []
+
+        class FakeAsyncAnthropic:
+            def __init__(self, api_key):
+                self.messages = SimpleNamespace(create=self.create)
+                self.closed = False
+
+            async def __aenter__(self):
+                opened_loops.append(asyncio.get_running_loop())
+                return self
+
+            async def __aexit__(self, *exc_info):
+                self.closed = True
+
+            async def create(self, **request):
+                assert not self.closed
+                return SimpleNamespace(
+                    content=[SimpleNamespace(text="Answer")], usage=SimpleNamespace(input_tokens=10, output_tokens=5)
+                )
+
+        monkeypatch.setattr("rag_bias_analysis.claude_analyzer.anthropic.AsyncAnthropic", FakeAsyncAnthropic)
+        analyzer = ClaudeRAGAnalyzer(api_key=None, cache_dir=temp_cache_dir, requests_per_second=100)
+        analyzer.client = SimpleNamespace(api_key="test-key")
+
+        analyzer.run_bias_analysis(sample_test_cases[:1])
+        analyzer.cache.clear()
+        analyzer.run_bias_analysis(sample_test_cases[:1])
+
+        assert len(opened_loops) == 2 and opened_loops[0] is not opened_loops[1]
+        assert analyzer.async_client is None
+        assert analyzer.api_calls_made == 2
+
+    def test_should_fetch_uncached_responses_in_one_message_batch(self, temp_cache_dir, sample_test_cases):
+        """Test that batch results are matched back to test cases by custom_id."""
+        submitted = []
+
+        def create(requests):
+            submitted.extend(requests)
+            return SimpleNamespace(id="batch_1", processing_status="ended")
+
+        def results(batch_id):
+            for request in submitted:
+                message = SimpleNamespace(
+                    content=[SimpleNamespace(text=f"Answer to {request['params']['messages'][0]['content'][-10:]}")],
+                    usage=SimpleNamespace(input_tokens=10, output_tokens=5),
+                )
+                yield SimpleNamespace(
+                    custom_id=request["custom_id"], result=SimpleNamespace(type="succeeded", message=message)
+                )
+
+        analyzer = ClaudeRAGAnalyzer(api_key=None, cache_dir=temp_cache_dir)
+        batches = SimpleNamespace(create=create, results=results)
+        analyzer.client = SimpleNamespace(beta=SimpleNamespace(messages=SimpleNamespace(batches=batches)))
+        test_cases = sample_test_cases + sample_test_cases[:1]
+
+        results_df = analyzer.run_bias_analysis(test_cases, use_batch_api=True)
+
+        assert len(submitted) == 1  # Both sample cases share a system prompt and query
+        assert analyzer.api_calls_made == 1
+        assert len(results_df) == 3
+        assert results_df["response"].str.startswith("Answer to").all()
+
+    def test_should_cancel_a_batch_that_outlives_its_timeout(self, temp_cache_dir, sample_test_cases):
+        """Test that a batch still running at the deadline is cancelled and reported as failed."""
+        cancelled: List[str] = []
+        batches = SimpleNamespace(
+            create=lambda requests: SimpleNamespace(id="batch_1", processing_status="in_progress"),
+            cancel=cancelled.append,
+        )
+        analyzer = ClaudeRAGAnalyzer(api_key=None, cache_dir=temp_cache_dir)
+        analyzer.client = SimpleNamespace(beta=SimpleNamespace(messages=SimpleNamespace(batches=batches)))
+
+        responses = analyzer._fetch_responses_batch(sample_test_cases, timeout=0)
+
+        assert cancelled == ["batch_1"]
+        assert all("did not finish" in response["error"] for response in responses)
+
+    def test_should_space_out_request_starts(self):
+        """Test that the shared rate limiter spaces concurrent request starts evenly."""
+        limiter = AsyncRateLimiter(rate=20)  # One request start every 50ms
+
+        async def start_request(start_times):
+            await limiter.wait()
+            start_times.append(asyncio.get_running_loop().time())
+
+        async def start_requests():
+            first_slot = asyncio.get_running_loop().time()
+            start_times: List[float] = []
+            await asyncio.gather(*(start_request(start_times) for _ in range(4)))
+            return first_slot, start_times
+
+        first_slot, start_times = asyncio.run(start_requests())
+
+        # The nth request may start late on a loaded machine, but never before its slot
+        for n, start_time in enumerate(sorted(start_times)):
+            assert start_time - first_slot >= n * limiter.interval - 0.01
+
+
+class TestRAGBiasAnalyzer:
+    """Test generation of profile-query test cases."""
+
+    def test_should_generate_every_profile_query_combination(self):
+        """Test that each test case carries its own profile's personalized prompt."""
+        analyzer = RAGBiasAnalyzer(SYSTEM_PROMPT)
+
+        test_cases = list(analyzer.run_full_analysis())
+
+        assert len(test_cases) == len(TEST_PROFILES) * len(TEST_QUERIES)
+        for profile, first_case in zip(TEST_PROFILES, test_cases[::len(TEST_QUERIES)]):
+            assert first_case["profile"]["name"] == profile.name
+            assert first_case["system_prompt"] == analyzer.create_personalized_prompt(profile)
+
+    def test_should_select_comparison_profiles_by_title(self):
+        """Test that comparison pairs pick the documented profiles for each dimension."""
+        comparisons = RAGBiasAnalyzer(SYSTEM_PROMPT).generate_comparison_pairs()
+
+        names = {c["dimension"]: [profile.name for profile in c["profiles"]] for c in comparisons}
+        assert names["gender_same_role"] == ["Sarah Chen", "Michael Chen"]
+        assert names["seniority_progression"] == ["Jennifer Smith", "Jennifer Williams", "Jennifer Anderson"]
+        assert names["cultural_diversity"] == ["Oluwaseun Adeyemi", "Priya Sharma", "John Miller", "Anastasia Volkov"]
+
+        # Comparison lists are copies, so editing them leaves the shared index intact
+        for comparison in comparisons:
+            comparison["profiles"].clear()
+        assert len(RAGBiasAnalyzer(SYSTEM_PROMPT).generate_comparison_pairs()[0]["profiles"]) == 2
+
+    def test_should_mark_shared_system_prompt_for_prompt_caching(self):
+        """Test that the cacheable system prompt block is identical for every profile."""
+        analyzer = RAGBiasAnalyzer(SYSTEM_PROMPT)
+
+        prompts = [analyzer.create_personalized_prompt(profile) for profile in TEST_PROFILES[:2]]
+
+        assert prompts[0][0] == prompts[1][0]
+        assert prompts[0][0]["cache_control"] == {"type": "ephemeral"}
+        assert "Sarah Chen" in prompts[0][1]["text"]
+        assert "cache_control" not in prompts[0][1]
+
+    def test_should_build_personalized_prompt_once_per_profile(self):
+        """Test that a profile's context is reused, while callers get their own blocks."""
+        analyzer = RAGBiasAnalyzer(SYSTEM_PROMPT)
+        profile = TEST_PROFILES[0]
+
+        first_prompt = analyzer.create_personalized_prompt(profile)
+        first_prompt[1]["text"] = "edited"
+        second_prompt = analyzer.create_personalized_prompt(profile)
+
+        assert second_prompt[1]["text"].startswith("Current user context:")
+        assert second_prompt[1]["text"] is analyzer.create_personalized_prompt(profile)[1]["text"]
+        assert second_prompt != analyzer.create_personalized_prompt(TEST_PROFILES[1])
+
+
 class TestComprehensiveBiasCoverage:
     """Test that all documented bias types are covered."""
 
@@ -267,7 +593,7 @@ class TestComprehensiveBiasCoverage:
     def test_should_use_documented_test_profiles(self):
         """Verify test profiles match those documented in docs/rag-test-profiles.md."""
         # Check that key profiles from documentation are present
-        profile_names = [profile.name for profile in TEST_PROFILES]
+        profile_names = {profile.name for profile in TEST_PROFILES}
 
         required_profiles = [
             "Sarah Chen", "Michael Chen",  # Gender comparison
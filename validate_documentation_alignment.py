@@ -9,10 +9,48 @@ by the GitHub Copilot instructions.
 
 import re
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Pattern, Set
 
 from rag_bias_analysis.models import TEST_PROFILES, TEST_QUERIES
 
+# Profile lines like: "1. **Sarah Chen** - Senior Software Engineer, Engineering, Tel Aviv, 4 years, she/her"
+PROFILE_LINE_PATTERN = re.compile(r'^(\d+)\.\s+\*\*([^*]+)\*\*\s+-\s+(.+)')
+YEARS_PATTERN = re.compile(r'(\d+)\s+years?')
+QUERY_PATTERN = re.compile(r'\*\*Query\*\*:\s+"([^"]+)"\s+- \*\*Bias Dimension\*\*:\s+([^\n]+)')
+
+# Profile names and query texts defined in code, fixed at import
+CODE_PROFILE_NAMES = frozenset(profile.name for profile in TEST_PROFILES)
+CODE_QUERY_TEXTS = frozenset(query["query"] for query in TEST_QUERIES)
+
+# Key research findings and the code identifiers that indicate they are implemented
+RESEARCH_PATTERNS = {
+    "gender_bias": {
+        "finding": "Female applicants are more likely to receive communal words in references, while males are more likely to be described as leaders",
+        "implementation_indicators": ["leadership_words", "communal_words", "gender_bias_indicators"]
+    },
+    "cultural_bias": {
+        "finding": "American LLMs emphasizing innovation and individualism, European models prioritizing privacy and regulation",
+        "implementation_indicators": ["individualism_words", "collectivism_words", "cultural_bias_indicators"]
+    },
+    "seniority_bias": {
+        "finding": "Junior roles could receive more detailed explanations even when not warranted",
+        "implementation_indicators": ["beginner_indicators", "complexity_score", "seniority_bias_indicators"]
+    }
+}
+
+# Code files searched for implementation indicators
+RESEARCH_CODE_FILES = [
+    "rag_bias_analysis/claude_analyzer.py",
+    "rag_bias_analysis/core.py",
+    "rag_bias_analysis/analyzers.py"
+]
+
+# One alternation of literal indicators per research pattern
+RESEARCH_INDICATOR_PATTERNS = {
+    name: re.compile("|".join(map(re.escape, info["implementation_indicators"])))
+    for name, info in RESEARCH_PATTERNS.items()
+}
+
 
 class DocumentationValidator:
     """Validates alignment between code and documentation."""
@@ -21,6 +59,8 @@ class DocumentationValidator:
         self.docs_dir = Path("docs")
         self.profiles_file = self.docs_dir / "rag-test-profiles.md"
         self.research_file = self.docs_dir / "rag-bias-research.md"
+        # File contents shared by the checks of one run_full_validation call
+        self._text_cache: Optional[Dict[Path, str]] = None
 
     def validate_profile_alignment(self) -> Dict[str, any]:
         """
@@ -42,33 +82,34 @@ class DocumentationValidator:
             return results
 
         # Read documented profiles
-        content = self.profiles_file.read_text()
+        content = self._read_text(self.profiles_file)
         documented_profiles = self._extract_documented_profiles(content)
 
         # Compare with code profiles
-        code_profile_names = {p.name for p in TEST_PROFILES}
-        documented_names = {p["name"] for p in documented_profiles}
+        code_profile_names = CODE_PROFILE_NAMES
+        # First documented entry per name, matching a linear search of the list
+        doc_by_name: Dict[str, Dict[str, Any]] = {}
+        for doc_profile in documented_profiles:
+            doc_by_name.setdefault(doc_profile["name"], doc_profile)
+        documented_names = doc_by_name.keys()
 
         # Check for missing profiles (in docs but not in code)
         missing = documented_names - code_profile_names
         if missing:
             results["status"] = "FAIL"
-            results["missing_profiles"] = list(missing)
-            results["issues"].append(f"Missing profiles in code: {missing}")
+            results["missing_profiles"] = sorted(missing)
+            results["issues"].append(f"Missing profiles in code: {results['missing_profiles']}")
 
         # Check for extra profiles (in code but not in docs)
         extra = code_profile_names - documented_names
         if extra:
             results["status"] = "FAIL"
-            results["extra_profiles"] = list(extra)
-            results["issues"].append(f"Extra profiles in code: {extra}")
+            results["extra_profiles"] = sorted(extra)
+            results["issues"].append(f"Extra profiles in code: {results['extra_profiles']}")
 
         # Validate profile details for matching names
         for code_profile in TEST_PROFILES:
-            matching_doc = next(
-                (p for p in documented_profiles if p["name"] == code_profile.name),
-                None
-            )
+            matching_doc = doc_by_name.get(code_profile.name)
             if matching_doc:
                 profile_issues = self._validate_profile_details(code_profile, matching_doc)
                 if profile_issues:
@@ -97,32 +138,10 @@ class DocumentationValidator:
             results["issues"].append("docs/rag-bias-research.md not found")
             return results
 
-        # Check for key research findings implementation
-        research_patterns = {
-            "gender_bias": {
-                "finding": "Female applicants are more likely to receive communal words in references, while males are more likely to be described as leaders",
-                "implementation_indicators": ["leadership_words", "communal_words", "gender_bias_indicators"]
-            },
-            "cultural_bias": {
-                "finding": "American LLMs emphasizing innovation and individualism, European models prioritizing privacy and regulation",
-                "implementation_indicators": ["individualism_words", "collectivism_words", "cultural_bias_indicators"]
-            },
-            "seniority_bias": {
-                "finding": "Junior roles could receive more detailed explanations even when not warranted",
-                "implementation_indicators": ["beginner_indicators", "complexity_score", "seniority_bias_indicators"]
-            }
-        }
+        implemented_patterns = self._find_implemented_patterns(RESEARCH_CODE_FILES, RESEARCH_INDICATOR_PATTERNS)
 
-        # Check implementations in code files
-        code_files = [
-            "rag_bias_analysis/claude_analyzer.py",
-            "rag_bias_analysis/core.py",
-            "rag_bias_analysis/analyzers.py"
-        ]
-
-        for pattern_name, pattern_info in research_patterns.items():
-            implemented = self._check_research_implementation(code_files, pattern_info["implementation_indicators"])
-            if implemented:
+        for pattern_name, pattern_info in RESEARCH_PATTERNS.items():
+            if pattern_name in implemented_patterns:
                 results["implemented_findings"].append(pattern_name)
             else:
                 results["status"] = "FAIL"
@@ -147,20 +166,20 @@ class DocumentationValidator:
             results["issues"].append("docs/rag-test-profiles.md not found")
             return results
 
-        content = self.profiles_file.read_text()
+        content = self._read_text(self.profiles_file)
         documented_queries = self._extract_documented_queries(content)
 
         # Check if documented queries are implemented
-        code_query_texts = {q["query"] for q in TEST_QUERIES}
+        code_query_texts = CODE_QUERY_TEXTS
         documented_texts = {q["query"] for q in documented_queries}
 
         missing = documented_texts - code_query_texts
         if missing:
             results["status"] = "FAIL"
-            results["missing_queries"] = list(missing)
-            results["issues"].append(f"Missing queries in code: {missing}")
+            results["missing_queries"] = sorted(missing)
+            results["issues"].append(f"Missing queries in code: {results['missing_queries']}")
         else:
-            results["validated_queries"] = list(documented_texts & code_query_texts)
+            results["validated_queries"] = sorted(documented_texts & code_query_texts)
 
         return results
 
@@ -173,7 +192,7 @@ class DocumentationValidator:
         for line in lines:
             # Match profile lines like: "1. **Sarah Chen** - Senior Software Engineer, Engineering, Tel Aviv, 4 years, she/her"
             # Handle cases with and without pronouns, and complex locations
-            match = re.match(r'^(\d+)\.\s+\*\*([^*]+)\*\*\s+-\s+(.+)', line.strip())
+            match = PROFILE_LINE_PATTERN.match(line.strip())
             if match:
                 _, name, rest = match.groups()
 
@@ -185,15 +204,16 @@ class DocumentationValidator:
                     department = parts[1]
 
                     # Find the years part - it contains a number followed by "year" or "years"
-                    years_part = None
                     years_idx = None
+                    years = 0
                     for i, part in enumerate(parts):
-                        if re.search(r'\d+\s+years?', part):
-                            years_part = part
+                        years_match = YEARS_PATTERN.search(part)
+                        if years_match:
                             years_idx = i
+                            years = int(years_match.group(1))
                             break
 
-                    if years_part and years_idx is not None and years_idx >= 2:
+                    if years_idx is not None and years_idx >= 2:
                         # Location is everything between department (index 1) and years (years_idx)
                         if years_idx == 2:
                             # Simple location like "Tel Aviv"
@@ -203,23 +223,20 @@ class DocumentationValidator:
                             location_parts = parts[2:years_idx]
                             location = ', '.join(location_parts)
 
-                        # Extract years number
-                        years_match = re.search(r'(\d+)\s+years?', years_part)
-                        years = int(years_match.group(1)) if years_match else 0
-
                         # Pronouns (if any) come after years part
                         pronouns = ""
                         if years_idx + 1 < len(parts):
-                            potential_pronouns = parts[years_idx + 1].strip()
+                            potential_pronouns = parts[years_idx + 1]
                             # Check if it looks like pronouns (contains / and common pronouns)
                             if '/' in potential_pronouns and any(p in potential_pronouns.lower() for p in ['he', 'she', 'they']):
                                 pronouns = potential_pronouns
 
+                        # Parts are already stripped; only the captured name may carry whitespace
                         profiles.append({
                             "name": name.strip(),
-                            "title": title.strip(),
-                            "department": department.strip(),
-                            "location": location.strip(),
+                            "title": title,
+                            "department": department,
+                            "location": location,
                             "years": years,
                             "pronouns": pronouns
                         })
@@ -230,10 +247,7 @@ class DocumentationValidator:
         """Extract query information from documentation."""
         queries = []
 
-        # Pattern to match query sections
-        query_pattern = r'\*\*Query\*\*:\s+"([^"]+)"\s+- \*\*Bias Dimension\*\*:\s+([^\n]+)'
-
-        matches = re.findall(query_pattern, content)
+        matches = QUERY_PATTERN.findall(content)
         for query_text, bias_dimension in matches:
             queries.append({
                 "query": query_text.strip(),
@@ -242,6 +256,21 @@ class DocumentationValidator:
 
         return queries
 
+    def _read_text(self, path: Path) -> str:
+        """
+        Read a file, at most once per run_full_validation call.
+
+        Outside run_full_validation (e.g. calling validate_profile_alignment
+        directly) every call reads the file from disk.
+        """
+        if self._text_cache is None:
+            return path.read_text(encoding='utf-8')
+        text = self._text_cache.get(path)
+        if text is None:
+            text = path.read_text(encoding='utf-8')
+            self._text_cache[path] = text
+        return text
+
     def _validate_profile_details(self, code_profile, doc_profile) -> List[str]:
         """Validate that profile details match between code and documentation."""
         issues = []
@@ -260,22 +289,28 @@ class DocumentationValidator:
 
         return issues
 
-    def _check_research_implementation(self, code_files: List[str], indicators: List[str]) -> bool:
-        """Check if research findings are implemented in code."""
+    def _find_implemented_patterns(self, code_files: List[str], indicator_patterns: Dict[str, Pattern[str]]) -> Set[str]:
+        """Return the research patterns with at least one implementation indicator in the code files."""
+        implemented: Set[str] = set()
         for file_path in code_files:
             if Path(file_path).exists():
-                content = Path(file_path).read_text(encoding='utf-8')
-                if any(indicator in content for indicator in indicators):
-                    return True
-        return False
+                content = self._read_text(Path(file_path))
+                implemented.update(name for name, pattern in indicator_patterns.items() if pattern.search(content))
+        return implemented
 
     def run_full_validation(self) -> Dict[str, any]:
         """Run all validation checks."""
         print("🔍 Validating documentation alignment...")
 
-        profile_results = self.validate_profile_alignment()
-        research_results = self.validate_research_alignment()
-        query_results = self.validate_query_alignment()
+        # Share file contents between the checks of this run only; the next
+        # run re-reads files in case they changed
+        self._text_cache = {}
+        try:
+            profile_results = self.validate_profile_alignment()
+            research_results = self.validate_research_alignment()
+            query_results = self.validate_query_alignment()
+        finally:
+            self._text_cache = None
 
         overall_status = "PASS"
         if any(r["status"] == "FAIL" for r in [profile_results, research_results, query_results]):